@@ -1,16 +1,18 @@
 from __future__ import annotations
 
+import html
 from dataclasses import dataclass
-from functools import lru_cache
-from typing import Callable
+from functools import cached_property, lru_cache
+from typing import Callable, NamedTuple
 
 import numpy as np
 import plotly.graph_objects as go
 import streamlit as st
-from scipy.integrate import quad
-from scipy.stats import norm
+from scipy.special import ndtr, ndtri
 
 EPS = 1e-9
+MAX_PLOT_POINTS = 500
+CURVE_GRID_POINTS = {"Quantity Flexibility Contract": 100}
 
 CONTRACT_DESCRIPTIONS = {
     "Wholesale Price Contract": (
@@ -43,6 +45,17 @@ PALETTE = {
     "muted": "#8b949e",
 }
 
+CHART_GRID_COLOR = "#283042"
+CHART_LAYOUT = {
+    "template": "plotly_dark",
+    "paper_bgcolor": PALETTE["bg"],
+    "plot_bgcolor": PALETTE["bg"],
+    "font": {"color": PALETTE["text"]},
+    "hovermode": "x unified",
+    "margin": {"l": 40, "r": 25, "t": 52, "b": 40},
+    "legend": {"orientation": "h", "yanchor": "bottom", "y": 1.02, "xanchor": "right", "x": 1.0},
+}
+
 
 def apply_dark_theme() -> None:
     st.set_page_config(
@@ -78,11 +91,26 @@ def apply_dark_theme() -> None:
                 margin-top: 0.6rem;
                 margin-bottom: 0.4rem;
             }}
-            .stMetric {{
+            .metric-grid {{
+                display: grid;
+                gap: 0.75rem;
+                margin-bottom: 1rem;
+            }}
+            .metric-card {{
                 background-color: {PALETTE["card"]};
                 border: 1px solid #263245;
                 border-radius: 10px;
-                padding: 0.55rem;
+                padding: 0.55rem 0.75rem;
+            }}
+            .metric-label {{
+                color: {PALETTE["muted"]};
+                font-size: 0.85rem;
+            }}
+            .metric-value {{
+                color: {PALETTE["text"]};
+                font-size: 1.6rem;
+                font-weight: 600;
+                overflow-wrap: anywhere;
             }}
             .stAlert {{
                 border-radius: 10px;
@@ -114,32 +142,87 @@ def clamp(value: float, low: float, high: float) -> float:
     return float(max(low, min(value, high)))
 
 
-def inventory_stats(order_qty: float, demand: float) -> dict[str, float]:
+class CostRates(NamedTuple):
+    salvage: float
+    holding: float
+    shortage: float
+    penalty: float
+
+
+class InventoryStats(NamedTuple):
+    sales: float
+    leftover: float
+    unmet: float
+    service_level: float
+
+
+class InventoryAdjustment(NamedTuple):
+    salvage: float
+    holding: float
+    shortage: float
+    penalty: float
+    net: float
+
+
+class OptionCost(NamedTuple):
+    should_exercise: bool
+    exercised_qty: float
+    total_cost: float
+    spot_only_cost: float
+    expected_demand: float
+    expected_unhedged: float
+    exceed_probability: float
+
+
+class QuantityFlexOutcome(NamedTuple):
+    lower: float
+    upper: float
+    final_order: float
+    unmet: float
+    overstock: float
+    procurement_cost: float
+    total_cost: float
+    service_level: float
+    expected_demand: float
+
+
+def inventory_stats(order_qty: float, demand: float) -> InventoryStats:
     sales = min(order_qty, demand)
     leftover = max(order_qty - demand, 0.0)
     unmet = max(demand - order_qty, 0.0)
-    service_level = 1.0 if demand <= EPS else np.clip(sales / demand, 0.0, 1.0)
-    return {
-        "sales": float(sales),
-        "leftover": float(leftover),
-        "unmet": float(unmet),
-        "service_level": float(service_level),
-    }
+    service_level = 1.0 if demand <= EPS else clamp(sales / demand, 0.0, 1.0)
+    return InventoryStats(float(sales), float(leftover), float(unmet), float(service_level))
 
 
-def inventory_adjustment(leftover: float, unmet: float, costs: dict[str, float]) -> dict[str, float]:
-    salvage = costs.get("salvage", 0.0) * leftover
-    holding = costs.get("holding", 0.0) * leftover
-    shortage = costs.get("shortage", 0.0) * unmet
-    penalty = costs.get("penalty", 0.0) * unmet
+def inventory_adjustment(leftover: float, unmet: float, rates: CostRates) -> InventoryAdjustment:
+    salvage = rates.salvage * leftover
+    holding = rates.holding * leftover
+    shortage = rates.shortage * unmet
+    penalty = rates.penalty * unmet
     net = salvage - holding - shortage - penalty
-    return {
-        "salvage": float(salvage),
-        "holding": float(holding),
-        "shortage": float(shortage),
-        "penalty": float(penalty),
-        "net": float(net),
-    }
+    return InventoryAdjustment(float(salvage), float(holding), float(shortage), float(penalty), float(net))
+
+
+def cost_rates(costs: dict[str, float]) -> CostRates:
+    return CostRates(
+        salvage=float(costs.get("salvage", 0.0)),
+        holding=float(costs.get("holding", 0.0)),
+        shortage=float(costs.get("shortage", 0.0)),
+        penalty=float(costs.get("penalty", 0.0)),
+    )
+
+
+def inventory_levels(
+    order_qty: float | np.ndarray,
+    demand: float | np.ndarray,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    sales = np.minimum(order_qty, demand)
+    return sales, np.maximum(order_qty - demand, 0.0), np.maximum(demand - order_qty, 0.0)
+
+
+def inventory_net(leftover: float | np.ndarray, unmet: float | np.ndarray, rates: CostRates) -> float | np.ndarray:
+    salvage, holding, shortage, penalty = rates
+    return (salvage - holding) * leftover - (shortage + penalty) * unmet
 
 
 def parse_float_list(text: str) -> list[float]:
@@ -152,35 +235,31 @@ def parse_float_list(text: str) -> list[float]:
     return values
 
 
-@lru_cache(maxsize=4096)
-def normal_expected_sales(mean: float, std: float, order_qty: float) -> float:
+def normal_partial_expectation(mean: float, std: float, upper: float | np.ndarray) -> float | np.ndarray:
+    z = (upper - mean) / std
+    return mean * ndtr(z) - std * np.exp(-0.5 * z * z) / np.sqrt(2.0 * np.pi)
+
+
+def normal_expected_sales(mean: float, std: float, order_qty: float | np.ndarray) -> float | np.ndarray:
     mean = float(mean)
     std = float(std)
-    order_qty = max(float(order_qty), 0.0)
+    order_qty = np.maximum(order_qty, 0.0)
     if std <= EPS:
-        return float(min(max(mean, 0.0), order_qty))
-    distribution = norm(loc=mean, scale=std)
-    expected, _ = quad(
-        lambda d: min(order_qty, d) * distribution.pdf(d),
-        0.0,
-        np.inf,
-        limit=250,
-    )
-    return float(expected)
+        return np.minimum(max(mean, 0.0), order_qty)
+    above = 1.0 - ndtr((order_qty - mean) / std)
+    below = normal_partial_expectation(mean, std, order_qty) - normal_partial_expectation(mean, std, 0.0)
+    return below + order_qty * above
 
 
-@lru_cache(maxsize=1024)
 def normal_expected_demand(mean: float, std: float) -> float:
     mean = float(mean)
     std = float(std)
     if std <= EPS:
         return float(max(mean, 0.0))
-    distribution = norm(loc=mean, scale=std)
-    expected, _ = quad(lambda d: d * distribution.pdf(d), 0.0, np.inf, limit=250)
-    return float(expected)
+    return float(mean - normal_partial_expectation(mean, std, 0.0))
 
 
-@dataclass
+@dataclass(frozen=True, eq=False)
 class DemandModel:
     mode: str
     distribution: str
@@ -190,129 +269,196 @@ class DemandModel:
     def is_random(self) -> bool:
         return self.mode == "Random"
 
-    def expected_of(self, fn: Callable[[float], float]) -> float:
+    @property
+    def cache_key(self) -> tuple:
+        params = tuple(
+            (name, tuple(np.asarray(value, dtype=float).tolist()) if isinstance(value, np.ndarray) else float(value))
+            for name, value in sorted(self.params.items())
+        )
+        return self.mode, self.distribution, params
+
+    @cached_property
+    def negative_mass(self) -> float:
+        if self.distribution != "normal":
+            return 0.0
+        mean = float(self.params["mean"])
+        std = float(self.params["std"])
+        if std <= EPS:
+            return 0.0
+        return float(ndtr(-mean / std))
+
+    @cached_property
+    def expected_demand(self) -> float:
         if self.distribution == "deterministic":
-            return float(fn(float(self.params["demand"])))
-
+            return float(self.params["demand"])
         if self.distribution == "normal":
+            return normal_expected_demand(float(self.params["mean"]), float(self.params["std"]))
+        if self.distribution == "uniform":
+            low = float(self.params["low"])
+            high = float(self.params["high"])
+            return low if abs(high - low) <= EPS else 0.5 * (low + high)
+        if self.distribution == "discrete":
+            return float(np.dot(self.params["demands"], self.params["probabilities"]))
+        raise ValueError("Unsupported demand distribution.")
+
+    @cached_property
+    def cumulative(self) -> np.ndarray:
+        cumulative = np.cumsum(self.params["probabilities"])
+        cumulative.setflags(write=False)
+        return cumulative
+
+    @cached_property
+    def upper_quantile(self) -> float:
+        return self.ppf(0.995)
+
+    @cached_property
+    def sorted_demands(self) -> np.ndarray:
+        demands = np.sort(np.array(self.params["demands"], dtype=float))
+        demands.setflags(write=False)
+        return demands
+
+    @classmethod
+    def from_cache_key(cls, key: tuple) -> DemandModel:
+        mode, distribution, params = key
+        return cls(
+            mode=mode,
+            distribution=distribution,
+            params={name: np.array(value, dtype=float) if isinstance(value, tuple) else value for name, value in params},
+        )
+
+    def cdf(self, x: float | np.ndarray) -> float | np.ndarray:
+        x = np.asarray(x, dtype=float)
+        if self.distribution == "deterministic":
+            result = np.where(x >= float(self.params["demand"]), 1.0, 0.0)
+
+        elif self.distribution == "normal":
             mean = float(self.params["mean"])
             std = float(self.params["std"])
             if std <= EPS:
-                return float(fn(max(mean, 0.0)))
-            distribution = norm(loc=mean, scale=std)
-            negative_mass = float(distribution.cdf(0.0))
-            integral, _ = quad(lambda d: fn(d) * distribution.pdf(d), 0.0, np.inf, limit=250)
-            return float(integral + fn(0.0) * negative_mass)
+                result = np.where(x >= max(mean, 0.0), 1.0, 0.0)
+            else:
+                result = np.maximum(ndtr((x - mean) / std), self.negative_mass)
 
-        if self.distribution == "uniform":
+        elif self.distribution == "uniform":
             low = float(self.params["low"])
             high = float(self.params["high"])
-            if abs(high - low) <= EPS:
-                return float(fn(low))
-            pdf = 1.0 / (high - low)
-            integral, _ = quad(lambda d: fn(d) * pdf, low, high, limit=250)
-            return float(integral)
+            inner = (x - low) / max(high - low, EPS)
+            result = np.where(x <= low, 0.0, np.where(x >= high, 1.0, inner))
 
-        if self.distribution == "discrete":
-            demands = self.params["demands"]
-            probabilities = self.params["probabilities"]
-            evaluated = np.array([fn(float(d)) for d in demands], dtype=float)
-            return float(np.dot(evaluated, probabilities))
+        elif self.distribution == "discrete":
+            idx = np.searchsorted(self.params["demands"], x, side="right")
+            result = np.where(idx > 0, self.cumulative[idx - 1], 0.0)
 
-        raise ValueError("Unsupported demand distribution.")
+        else:
+            result = np.zeros_like(x)
+
+        return float(result) if result.ndim == 0 else result
 
-    def cdf(self, x: float) -> float:
-        x = float(x)
+    def ppf(self, probability: float | np.ndarray) -> float | np.ndarray:
+        probability = np.clip(np.asarray(probability, dtype=float), 0.0, 1.0)
         if self.distribution == "deterministic":
-            return float(1.0 if x >= float(self.params["demand"]) else 0.0)
+            result = np.full_like(probability, float(self.params["demand"]))
 
-        if self.distribution == "normal":
+        elif self.distribution == "normal":
             mean = float(self.params["mean"])
             std = float(self.params["std"])
             if std <= EPS:
-                return float(1.0 if x >= max(mean, 0.0) else 0.0)
-            distribution = norm(loc=mean, scale=std)
-            if x <= 0.0:
-                return float(distribution.cdf(0.0))
-            return float(distribution.cdf(x))
+                result = np.full_like(probability, max(mean, 0.0))
+            else:
+                result = np.maximum(mean + std * ndtri(probability), 0.0)
 
-        if self.distribution == "uniform":
+        elif self.distribution == "uniform":
             low = float(self.params["low"])
             high = float(self.params["high"])
-            if x <= low:
-                return 0.0
-            if x >= high:
-                return 1.0
-            return float((x - low) / max(high - low, EPS))
+            result = low + probability * (high - low)
 
-        if self.distribution == "discrete":
-            demands = self.params["demands"]
-            probabilities = self.params["probabilities"]
-            mask = demands <= x
-            return float(np.sum(probabilities[mask]))
+        elif self.distribution == "discrete":
+            demands = np.asarray(self.params["demands"], dtype=float)
+            idx = np.minimum(np.searchsorted(self.cumulative, probability, side="left"), len(demands) - 1)
+            result = demands[idx]
 
-        return 0.0
+        else:
+            result = np.zeros_like(probability)
+
+        return float(result) if result.ndim == 0 else result
 
-    def ppf(self, probability: float) -> float:
-        probability = float(np.clip(probability, 0.0, 1.0))
+    def expected_sales(self, order_qty: float | np.ndarray) -> float | np.ndarray:
+        order_qty = np.maximum(np.asarray(order_qty, dtype=float), 0.0)
         if self.distribution == "deterministic":
-            return float(self.params["demand"])
+            return np.minimum(order_qty, self.expected_demand)
 
         if self.distribution == "normal":
-            mean = float(self.params["mean"])
-            std = float(self.params["std"])
-            if std <= EPS:
-                return float(max(mean, 0.0))
-            quantile = float(norm.ppf(probability, loc=mean, scale=std))
-            return float(max(quantile, 0.0))
+            return normal_expected_sales(float(self.params["mean"]), float(self.params["std"]), order_qty)
 
         if self.distribution == "uniform":
             low = float(self.params["low"])
             high = float(self.params["high"])
-            return float(low + probability * (high - low))
+            if abs(high - low) <= EPS:
+                return np.minimum(order_qty, low)
+            capped = np.clip(order_qty, low, high)
+            return (0.5 * (capped * capped - low * low) + order_qty * (high - capped)) / (high - low)
 
         if self.distribution == "discrete":
-            demands = self.params["demands"]
-            probabilities = self.params["probabilities"]
-            cumulative = np.cumsum(probabilities)
-            idx = int(np.searchsorted(cumulative, probability, side="left"))
-            idx = min(idx, len(demands) - 1)
-            return float(demands[idx])
+            return np.minimum(order_qty[..., None], self.params["demands"]) @ self.params["probabilities"]
 
-        return 0.0
+        raise ValueError("Unsupported demand distribution.")
 
-    def metrics(self, order_qty: float) -> dict[str, float]:
-        order_qty = max(float(order_qty), 0.0)
-        if self.distribution == "normal":
-            mean = float(self.params["mean"])
-            std = float(self.params["std"])
-            expected_sales = normal_expected_sales(mean, std, order_qty)
-            expected_demand = normal_expected_demand(mean, std)
-        else:
-            expected_sales = self.expected_of(lambda d: min(order_qty, d))
-            expected_demand = self.expected_of(lambda d: d)
+    def expected_leftover(self, order_qty: float | np.ndarray) -> float | np.ndarray:
+        order_qty = np.maximum(np.asarray(order_qty, dtype=float), 0.0)
+        return np.maximum(order_qty - self.expected_sales(order_qty), 0.0)
+
+    def expected_unmet(self, order_qty: float | np.ndarray) -> float | np.ndarray:
+        return np.maximum(self.expected_demand - self.expected_sales(order_qty), 0.0)
+
+    def expected_clamp(self, lower: float, upper: float) -> float:
+        return float(lower + self.expected_sales(upper) - self.expected_sales(lower))
 
-        expected_leftover = max(order_qty - expected_sales, 0.0)
-        expected_unmet = max(expected_demand - expected_sales, 0.0)
-        service_level = 1.0 if expected_demand <= EPS else np.clip(expected_sales / expected_demand, 0.0, 1.0)
-        stockout_probability = float(np.clip(1.0 - self.cdf(order_qty), 0.0, 1.0))
+    def metrics_vec(self, order_qty: float | np.ndarray) -> dict[str, np.ndarray]:
+        order_qty = np.maximum(np.asarray(order_qty, dtype=float), 0.0)
+        expected_demand = self.expected_demand
+        expected_sales = self.expected_sales(order_qty)
+        expected_leftover = np.maximum(order_qty - expected_sales, 0.0)
+        expected_unmet = np.maximum(expected_demand - expected_sales, 0.0)
+        if expected_demand <= EPS:
+            service_level = np.ones_like(order_qty)
+        else:
+            service_level = np.clip(expected_sales / expected_demand, 0.0, 1.0)
+        stockout_probability = np.clip(1.0 - self.cdf(order_qty), 0.0, 1.0)
         return {
-            "expected_sales": float(expected_sales),
-            "expected_demand": float(expected_demand),
-            "expected_leftover": float(expected_leftover),
-            "expected_unmet": float(expected_unmet),
-            "service_level": float(service_level),
+            "expected_sales": expected_sales,
+            "expected_demand": np.full_like(order_qty, expected_demand),
+            "expected_leftover": expected_leftover,
+            "expected_unmet": expected_unmet,
+            "service_level": service_level,
             "stockout_probability": stockout_probability,
         }
 
+    def metrics(self, order_qty: float) -> dict[str, float]:
+        if self.distribution == "deterministic":
+            order_qty = max(float(order_qty), 0.0)
+            demand = self.expected_demand
+            stats = inventory_stats(order_qty, demand)
+            return {
+                "expected_sales": stats.sales,
+                "expected_demand": demand,
+                "expected_leftover": stats.leftover,
+                "expected_unmet": stats.unmet,
+                "service_level": stats.service_level,
+                "stockout_probability": 0.0 if order_qty >= demand else 1.0,
+            }
+        return dict(cached_metrics(self.cache_key, float(order_qty)))
+
     def demand_grid(self, num_points: int = 100) -> np.ndarray:
+        return cached_demand_grid(self.cache_key, int(num_points))
+
+    def build_demand_grid(self, num_points: int) -> np.ndarray:
         if self.distribution == "deterministic":
             demand = float(self.params["demand"])
             upper = max(1.0, demand * 2.0)
             return np.linspace(0.0, upper, num_points)
 
         if self.distribution == "normal":
-            upper = max(1.0, self.ppf(0.995))
+            upper = max(1.0, self.upper_quantile)
             return np.linspace(0.0, upper, num_points)
 
         if self.distribution == "uniform":
@@ -324,7 +470,7 @@ class DemandModel:
             return np.linspace(low, high, num_points)
 
         if self.distribution == "discrete":
-            demands = np.sort(np.array(self.params["demands"], dtype=float))
+            demands = self.sorted_demands
             if len(demands) == 1:
                 upper = max(1.0, demands[0] * 2.0)
                 return np.linspace(0.0, upper, num_points)
@@ -336,14 +482,27 @@ class DemandModel:
         if self.distribution == "deterministic":
             return max(1.0, float(self.params["demand"]))
         if self.distribution == "normal":
-            return max(1.0, self.ppf(0.995))
+            return max(1.0, self.upper_quantile)
         if self.distribution == "uniform":
             return max(1.0, float(self.params["high"]))
         if self.distribution == "discrete":
-            return max(1.0, float(np.max(self.params["demands"])))
+            return max(1.0, float(self.sorted_demands[-1]))
         return 100.0
 
 
+@lru_cache(maxsize=4096)
+def cached_metrics(model_key: tuple, order_qty: float) -> dict[str, float]:
+    model = DemandModel.from_cache_key(model_key)
+    return {key: float(value) for key, value in model.metrics_vec(order_qty).items()}
+
+
+@lru_cache(maxsize=256)
+def cached_demand_grid(model_key: tuple, num_points: int) -> np.ndarray:
+    grid = np.array(DemandModel.from_cache_key(model_key).build_demand_grid(num_points), dtype=np.float64)
+    grid.setflags(write=False)
+    return grid
+
+
 def demand_handler(demand_type: str, distribution_type: str | None, key_prefix: str) -> DemandModel | None:
     st.markdown("#### Demand Inputs")
     if demand_type == "Deterministic":
@@ -433,15 +592,15 @@ def demand_handler(demand_type: str, distribution_type: str | None, key_prefix:
             return None
 
         total_prob = float(sum(probs_raw))
-        if not np.isclose(total_prob, 1.0, atol=1e-4):
+        if abs(total_prob - 1.0) > 1e-4:
             st.error(f"Probabilities must sum to 1. Current sum: {total_prob:.4f}")
             return None
 
         condensed: dict[float, float] = {}
         for d, p in zip(demands_raw, probs_raw):
             condensed[float(d)] = condensed.get(float(d), 0.0) + float(p)
-        demands_sorted = np.array(sorted(condensed.keys()), dtype=float)
-        probs_sorted = np.array([condensed[d] for d in demands_sorted], dtype=float)
+        demands_sorted = np.ascontiguousarray(sorted(condensed.keys()), dtype=np.float64)
+        probs_sorted = np.ascontiguousarray([condensed[d] for d in demands_sorted], dtype=np.float64)
         probs_sorted = probs_sorted / max(float(np.sum(probs_sorted)), EPS)
         return DemandModel(
             mode="Random",
@@ -453,114 +612,141 @@ def demand_handler(demand_type: str, distribution_type: str | None, key_prefix:
     return None
 
 
-def make_figure(title: str, x_label: str, y_label: str) -> go.Figure:
-    fig = go.Figure()
-    fig.update_layout(
-        title=title,
-        xaxis_title=x_label,
-        yaxis_title=y_label,
-        template="plotly_dark",
-        paper_bgcolor=PALETTE["bg"],
-        plot_bgcolor=PALETTE["bg"],
-        font={"color": PALETTE["text"]},
-        hovermode="x unified",
-        margin={"l": 40, "r": 25, "t": 52, "b": 40},
-        legend={"orientation": "h", "yanchor": "bottom", "y": 1.02, "xanchor": "right", "x": 1.0},
+def make_figure(title: str, x_label: str, y_label: str, traces: list[go.Scattergl]) -> go.Figure:
+    return go.Figure(
+        data=traces,
+        layout={
+            **CHART_LAYOUT,
+            "title": title,
+            "xaxis": {"title": x_label, "gridcolor": CHART_GRID_COLOR},
+            "yaxis": {"title": y_label, "gridcolor": CHART_GRID_COLOR},
+        },
     )
-    fig.update_xaxes(gridcolor="#283042")
-    fig.update_yaxes(gridcolor="#283042")
+
+
+def lttb_downsample(x: np.ndarray, y: np.ndarray, n_out: int) -> tuple[np.ndarray, np.ndarray]:
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    size = len(x)
+    if n_out >= size or n_out < 3:
+        return x, y
+
+    bucket = (size - 2) / (n_out - 2)
+    selected = np.empty(n_out, dtype=np.intp)
+    selected[0] = 0
+    selected[-1] = size - 1
+    anchor = 0
+    for i in range(n_out - 2):
+        start = int(i * bucket) + 1
+        stop = int((i + 1) * bucket) + 1
+        next_stop = min(int((i + 2) * bucket) + 1, size)
+        avg_x = x[stop:next_stop].mean()
+        avg_y = y[stop:next_stop].mean()
+        area = np.abs(
+            (x[anchor] - avg_x) * (y[start:stop] - y[anchor]) - (x[anchor] - x[start:stop]) * (avg_y - y[anchor])
+        )
+        area = np.where(np.isfinite(area), area, -1.0)
+        anchor = start + int(np.argmax(area))
+        selected[i + 1] = anchor
+    return x[selected], y[selected]
+
+
+def compact_figure(fig: go.Figure, n_out: int = MAX_PLOT_POINTS) -> go.Figure:
+    for trace in fig.data:
+        if trace.x is None or trace.y is None:
+            continue
+        x, y = lttb_downsample(trace.x, trace.y, n_out)
+        trace.update(x=x.astype(np.float32), y=y.astype(np.float32))
     return fig
 
 
 def wholesale_profit_expected(
-    order_qty: float,
+    order_qty: np.ndarray,
     demand_model: DemandModel,
     retail_price: float,
     wholesale_price: float,
-    costs: dict[str, float],
-) -> float:
-    m = demand_model.metrics(order_qty)
-    adjust = inventory_adjustment(m["expected_leftover"], m["expected_unmet"], costs)
-    return float(retail_price * m["expected_sales"] - wholesale_price * order_qty + adjust["net"])
+    rates: CostRates,
+) -> np.ndarray:
+    m = demand_model.metrics_vec(order_qty)
+    net = inventory_net(m["expected_leftover"], m["expected_unmet"], rates)
+    return retail_price * m["expected_sales"] - wholesale_price * order_qty + net
 
 
 def wholesale_profit_deterministic(
-    order_qty: float,
-    demand: float,
+    order_qty: float | np.ndarray,
+    demand: float | np.ndarray,
     retail_price: float,
     wholesale_price: float,
-    costs: dict[str, float],
-) -> float:
-    s = inventory_stats(order_qty, demand)
-    adjust = inventory_adjustment(s["leftover"], s["unmet"], costs)
-    return float(retail_price * s["sales"] - wholesale_price * order_qty + adjust["net"])
+    rates: CostRates,
+) -> np.ndarray:
+    sales, leftover, unmet = inventory_levels(order_qty, demand)
+    return retail_price * sales - wholesale_price * order_qty + inventory_net(leftover, unmet, rates)
 
 
 def buyback_profit_expected(
-    order_qty: float,
+    order_qty: np.ndarray,
     demand_model: DemandModel,
     retail_price: float,
     wholesale_price: float,
     buyback_price: float,
     production_cost: float,
-    costs: dict[str, float],
-) -> tuple[float, float, float]:
-    m = demand_model.metrics(order_qty)
-    adjust = inventory_adjustment(m["expected_leftover"], m["expected_unmet"], costs)
+    rates: CostRates,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    m = demand_model.metrics_vec(order_qty)
+    net = inventory_net(m["expected_leftover"], m["expected_unmet"], rates)
     retailer = retail_price * m["expected_sales"] + buyback_price * m["expected_leftover"] - wholesale_price * order_qty
-    retailer += adjust["net"]
+    retailer += net
     manufacturer = wholesale_price * order_qty - buyback_price * m["expected_leftover"]
-    total = retail_price * m["expected_sales"] - production_cost * order_qty + adjust["net"]
-    return float(retailer), float(manufacturer), float(total)
+    total = retail_price * m["expected_sales"] - production_cost * order_qty + net
+    return retailer, manufacturer, total
 
 
 def buyback_profit_deterministic(
-    order_qty: float,
-    demand: float,
+    order_qty: float | np.ndarray,
+    demand: float | np.ndarray,
     retail_price: float,
     wholesale_price: float,
     buyback_price: float,
     production_cost: float,
-    costs: dict[str, float],
-) -> tuple[float, float, float]:
-    s = inventory_stats(order_qty, demand)
-    adjust = inventory_adjustment(s["leftover"], s["unmet"], costs)
-    retailer = retail_price * s["sales"] + buyback_price * s["leftover"] - wholesale_price * order_qty + adjust["net"]
-    manufacturer = wholesale_price * order_qty - buyback_price * s["leftover"]
-    total = retail_price * s["sales"] - production_cost * order_qty + adjust["net"]
-    return float(retailer), float(manufacturer), float(total)
+    rates: CostRates,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    sales, leftover, unmet = inventory_levels(order_qty, demand)
+    net = inventory_net(leftover, unmet, rates)
+    retailer = retail_price * sales + buyback_price * leftover - wholesale_price * order_qty + net
+    manufacturer = wholesale_price * order_qty - buyback_price * leftover
+    total = retail_price * sales - production_cost * order_qty + net
+    return retailer, manufacturer, total
 
 
 def revenue_sharing_profit_expected(
-    order_qty: float,
+    order_qty: np.ndarray,
     demand_model: DemandModel,
     retail_price: float,
     wholesale_price: float,
     alpha: float,
-    costs: dict[str, float],
-) -> tuple[float, float, float]:
-    m = demand_model.metrics(order_qty)
-    adjust = inventory_adjustment(m["expected_leftover"], m["expected_unmet"], costs)
-    retailer = (1.0 - alpha) * retail_price * m["expected_sales"] - wholesale_price * order_qty + adjust["net"]
+    rates: CostRates,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    m = demand_model.metrics_vec(order_qty)
+    net = inventory_net(m["expected_leftover"], m["expected_unmet"], rates)
+    retailer = (1.0 - alpha) * retail_price * m["expected_sales"] - wholesale_price * order_qty + net
     supplier = alpha * retail_price * m["expected_sales"] + wholesale_price * order_qty
     total = retailer + supplier
-    return float(retailer), float(supplier), float(total)
+    return retailer, supplier, total
 
 
 def revenue_sharing_profit_deterministic(
-    order_qty: float,
-    demand: float,
+    order_qty: float | np.ndarray,
+    demand: float | np.ndarray,
     retail_price: float,
     wholesale_price: float,
     alpha: float,
-    costs: dict[str, float],
-) -> tuple[float, float, float]:
-    s = inventory_stats(order_qty, demand)
-    adjust = inventory_adjustment(s["leftover"], s["unmet"], costs)
-    retailer = (1.0 - alpha) * retail_price * s["sales"] - wholesale_price * order_qty + adjust["net"]
-    supplier = alpha * retail_price * s["sales"] + wholesale_price * order_qty
+    rates: CostRates,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    sales, leftover, unmet = inventory_levels(order_qty, demand)
+    retailer = (1.0 - alpha) * retail_price * sales - wholesale_price * order_qty + inventory_net(leftover, unmet, rates)
+    supplier = alpha * retail_price * sales + wholesale_price * order_qty
     total = retailer + supplier
-    return float(retailer), float(supplier), float(total)
+    return retailer, supplier, total
 
 
 def option_cost_deterministic(
@@ -569,7 +755,7 @@ def option_cost_deterministic(
     strike: float,
     premium: float,
     spot: float,
-) -> dict[str, float]:
+) -> OptionCost:
     should_exercise = spot > strike
     exercised = min(demand, option_qty) if should_exercise else 0.0
     if should_exercise:
@@ -577,12 +763,29 @@ def option_cost_deterministic(
     else:
         total_cost = option_qty * premium + demand * spot
     spot_only = demand * spot
-    return {
-        "should_exercise": float(1.0 if should_exercise else 0.0),
-        "exercised_qty": float(exercised),
-        "total_cost": float(total_cost),
-        "spot_only_cost": float(spot_only),
-    }
+    return OptionCost(
+        should_exercise=should_exercise,
+        exercised_qty=float(exercised),
+        total_cost=float(total_cost),
+        spot_only_cost=float(spot_only),
+        expected_demand=float(demand),
+        expected_unhedged=float(max(demand - exercised, 0.0)),
+        exceed_probability=1.0 if demand > option_qty else 0.0,
+    )
+
+
+def option_cost_deterministic_vec(
+    demand: float | np.ndarray,
+    option_qty: float,
+    strike: float,
+    premium: float,
+    spot: float | np.ndarray,
+) -> tuple[np.ndarray, np.ndarray]:
+    exercised = np.minimum(demand, option_qty)
+    hedged_cost = exercised * strike + np.maximum(demand - exercised, 0.0) * spot
+    spot_only = demand * spot
+    total_cost = option_qty * premium + np.where(spot > strike, hedged_cost, spot_only)
+    return total_cost, spot_only
 
 
 def option_cost_expected(
@@ -591,7 +794,7 @@ def option_cost_expected(
     strike: float,
     premium: float,
     spot: float,
-) -> dict[str, float]:
+) -> OptionCost:
     m = demand_model.metrics(option_qty)
     expected_min = m["expected_sales"]
     expected_demand = m["expected_demand"]
@@ -603,14 +806,15 @@ def option_cost_expected(
         total_cost = option_qty * premium + expected_demand * spot
         exercised_qty = 0.0
     spot_only = expected_demand * spot
-    return {
-        "should_exercise": float(1.0 if should_exercise else 0.0),
-        "exercised_qty": float(exercised_qty),
-        "total_cost": float(total_cost),
-        "spot_only_cost": float(spot_only),
-        "expected_demand": float(expected_demand),
-        "expected_unhedged": float(max(expected_demand - exercised_qty, 0.0)),
-    }
+    return OptionCost(
+        should_exercise=should_exercise,
+        exercised_qty=float(exercised_qty),
+        total_cost=float(total_cost),
+        spot_only_cost=float(spot_only),
+        expected_demand=float(expected_demand),
+        expected_unhedged=float(max(expected_demand - exercised_qty, 0.0)),
+        exceed_probability=float(m["stockout_probability"]),
+    )
 
 
 def quantity_flex_deterministic(
@@ -618,8 +822,8 @@ def quantity_flex_deterministic(
     initial_commitment: float,
     adjustment_pct: float,
     wholesale_price: float,
-    costs: dict[str, float],
-) -> dict[str, float]:
+    rates: CostRates,
+) -> QuantityFlexOutcome:
     span = adjustment_pct / 100.0
     lower = max(0.0, initial_commitment * (1.0 - span))
     upper = initial_commitment * (1.0 + span)
@@ -627,20 +831,40 @@ def quantity_flex_deterministic(
     unmet = max(demand - final_order, 0.0)
     overstock = max(final_order - demand, 0.0)
     procurement = final_order * wholesale_price
-    total_cost = procurement
-    total_cost += costs.get("holding", 0.0) * overstock
-    total_cost += (costs.get("shortage", 0.0) + costs.get("penalty", 0.0)) * unmet
-    total_cost -= costs.get("salvage", 0.0) * overstock
-    service_level = 1.0 if demand <= EPS else np.clip((demand - unmet) / demand, 0.0, 1.0)
+    total_cost = procurement - inventory_net(overstock, unmet, rates)
+    service_level = 1.0 if demand <= EPS else clamp((demand - unmet) / demand, 0.0, 1.0)
+    return QuantityFlexOutcome(
+        lower=float(lower),
+        upper=float(upper),
+        final_order=float(final_order),
+        unmet=float(unmet),
+        overstock=float(overstock),
+        procurement_cost=float(procurement),
+        total_cost=float(total_cost),
+        service_level=float(service_level),
+        expected_demand=float(demand),
+    )
+
+
+def quantity_flex_deterministic_vec(
+    demand: np.ndarray,
+    initial_commitment: float,
+    adjustment_pct: float,
+    wholesale_price: float,
+    rates: CostRates,
+) -> dict[str, np.ndarray | float]:
+    span = adjustment_pct / 100.0
+    lower = max(0.0, initial_commitment * (1.0 - span))
+    upper = initial_commitment * (1.0 + span)
+    final_order = np.clip(demand, lower, upper)
+    unmet = np.maximum(demand - final_order, 0.0)
+    overstock = np.maximum(final_order - demand, 0.0)
+    total_cost = final_order * wholesale_price - inventory_net(overstock, unmet, rates)
     return {
-        "lower": float(lower),
-        "upper": float(upper),
-        "final_order": float(final_order),
-        "unmet": float(unmet),
-        "overstock": float(overstock),
-        "procurement_cost": float(procurement),
-        "total_cost": float(total_cost),
-        "service_level": float(service_level),
+        "lower": lower,
+        "upper": upper,
+        "final_order": final_order,
+        "total_cost": total_cost,
     }
 
 
@@ -649,252 +873,130 @@ def quantity_flex_expected(
     initial_commitment: float,
     adjustment_pct: float,
     wholesale_price: float,
-    costs: dict[str, float],
-) -> dict[str, float]:
+    rates: CostRates,
+) -> QuantityFlexOutcome:
     span = adjustment_pct / 100.0
     lower = max(0.0, initial_commitment * (1.0 - span))
     upper = initial_commitment * (1.0 + span)
 
-    def final_order_fn(demand: float) -> float:
-        return clamp(demand, lower, upper)
-
-    final_order = demand_model.expected_of(final_order_fn)
-    unmet = demand_model.expected_of(lambda d: max(d - final_order_fn(d), 0.0))
-    overstock = demand_model.expected_of(lambda d: max(final_order_fn(d) - d, 0.0))
-    expected_demand = demand_model.expected_of(lambda d: d)
+    final_order = demand_model.expected_clamp(lower, upper)
+    unmet = float(demand_model.expected_unmet(upper))
+    overstock = float(demand_model.expected_leftover(lower))
+    expected_demand = demand_model.expected_demand
     procurement = final_order * wholesale_price
-    total_cost = procurement
-    total_cost += costs.get("holding", 0.0) * overstock
-    total_cost += (costs.get("shortage", 0.0) + costs.get("penalty", 0.0)) * unmet
-    total_cost -= costs.get("salvage", 0.0) * overstock
-    service_level = 1.0 if expected_demand <= EPS else np.clip((expected_demand - unmet) / expected_demand, 0.0, 1.0)
-    return {
-        "lower": float(lower),
-        "upper": float(upper),
-        "final_order": float(final_order),
-        "unmet": float(unmet),
-        "overstock": float(overstock),
-        "procurement_cost": float(procurement),
-        "total_cost": float(total_cost),
-        "service_level": float(service_level),
-        "expected_demand": float(expected_demand),
-    }
+    total_cost = procurement - inventory_net(overstock, unmet, rates)
+    service_level = 1.0 if expected_demand <= EPS else clamp((expected_demand - unmet) / expected_demand, 0.0, 1.0)
+    return QuantityFlexOutcome(
+        lower=float(lower),
+        upper=float(upper),
+        final_order=float(final_order),
+        unmet=float(unmet),
+        overstock=float(overstock),
+        procurement_cost=float(procurement),
+        total_cost=float(total_cost),
+        service_level=float(service_level),
+        expected_demand=float(expected_demand),
+    )
 
 
-def graph_functions(
+def order_quantity_grid(demand_model: DemandModel, order_qty: float, num_points: int = 70) -> np.ndarray:
+    q_max = max(10.0, order_qty * 2.0, demand_model.max_reasonable_demand() * 1.5)
+    return np.linspace(0.0, q_max, num_points)
+
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def compute_curves(
     contract_type: str,
-    demand_model: DemandModel,
+    model_key: tuple,
     params: dict[str, float],
     costs: dict[str, float],
-) -> list[go.Figure]:
-    figures: list[go.Figure] = []
+) -> dict[str, np.ndarray | float]:
+    demand_model = DemandModel.from_cache_key(model_key)
+    rates = cost_rates(costs)
+    demand_values = demand_model.demand_grid(CURVE_GRID_POINTS.get(contract_type, 90))
 
     if contract_type == "Wholesale Price Contract":
-        q_current = params["Q"]
-        q_max = max(10.0, q_current * 2.0, demand_model.max_reasonable_demand() * 1.5)
-        q_values = np.linspace(0.0, q_max, 70)
-        if demand_model.is_random:
-            profit_values = [
-                wholesale_profit_expected(q, demand_model, params["p"], params["w"], costs) for q in q_values
-            ]
-        else:
-            demand = float(demand_model.params["demand"])
-            profit_values = [
-                wholesale_profit_deterministic(q, demand, params["p"], params["w"], costs) for q in q_values
-            ]
-
-        fig1 = make_figure("Profit vs Order Quantity", "Order Quantity", "Profit")
-        fig1.add_trace(
-            go.Scatter(
-                x=q_values,
-                y=profit_values,
-                mode="lines",
-                name="Profit",
-                line={"color": PALETTE["primary"], "width": 3},
-            )
-        )
-
-        demand_values = demand_model.demand_grid(90)
-        demand_profit = [
-            wholesale_profit_deterministic(params["Q"], float(d), params["p"], params["w"], costs)
-            for d in demand_values
-        ]
-        fig2 = make_figure("Profit vs Demand", "Demand", "Profit")
-        fig2.add_trace(
-            go.Scatter(
-                x=demand_values,
-                y=demand_profit,
-                mode="lines",
-                name="Profit",
-                line={"color": PALETTE["secondary"], "width": 3},
-            )
-        )
-        figures.extend([fig1, fig2])
-
-    elif contract_type == "Buyback Contract":
-        q_current = params["Q"]
-        q_max = max(10.0, q_current * 2.0, demand_model.max_reasonable_demand() * 1.5)
-        q_values = np.linspace(0.0, q_max, 70)
-        retailer_curve: list[float] = []
-        manufacturer_curve: list[float] = []
-        total_curve: list[float] = []
-        for q in q_values:
-            if demand_model.is_random:
-                r, m, t = buyback_profit_expected(
-                    q,
-                    demand_model,
-                    params["p"],
-                    params["w"],
-                    params["b"],
-                    params["c"],
-                    costs,
-                )
-            else:
-                demand = float(demand_model.params["demand"])
-                r, m, t = buyback_profit_deterministic(
-                    q,
-                    demand,
-                    params["p"],
-                    params["w"],
-                    params["b"],
-                    params["c"],
-                    costs,
-                )
-            retailer_curve.append(r)
-            manufacturer_curve.append(m)
-            total_curve.append(t)
-
-        fig1 = make_figure("Profit vs Order Quantity", "Order Quantity", "Profit")
-        fig1.add_trace(
-            go.Scatter(x=q_values, y=retailer_curve, mode="lines", name="Retailer", line={"color": PALETTE["primary"]})
-        )
-        fig1.add_trace(
-            go.Scatter(
-                x=q_values,
-                y=manufacturer_curve,
-                mode="lines",
-                name="Manufacturer",
-                line={"color": PALETTE["secondary"]},
-            )
-        )
-        fig1.add_trace(
-            go.Scatter(x=q_values, y=total_curve, mode="lines", name="Total", line={"color": PALETTE["accent"]})
-        )
-
-        demand_values = demand_model.demand_grid(90)
-        retailer_demand: list[float] = []
-        total_demand: list[float] = []
-        for d in demand_values:
-            r, _, t = buyback_profit_deterministic(
-                params["Q"],
-                float(d),
-                params["p"],
-                params["w"],
-                params["b"],
-                params["c"],
-                costs,
-            )
-            retailer_demand.append(r)
-            total_demand.append(t)
-        fig2 = make_figure("Profit vs Demand", "Demand", "Profit")
-        fig2.add_trace(
-            go.Scatter(
-                x=demand_values,
-                y=retailer_demand,
-                mode="lines",
-                name="Retailer",
-                line={"color": PALETTE["primary"]},
-            )
-        )
-        fig2.add_trace(
-            go.Scatter(
-                x=demand_values,
-                y=total_demand,
-                mode="lines",
-                name="Total",
-                line={"color": PALETTE["accent"]},
-            )
-        )
-        figures.extend([fig1, fig2])
+        order_qty = params["Q"]
+        retail_price = params["p"]
+        wholesale_price = params["w"]
+        q_values = order_quantity_grid(demand_model, order_qty)
+        return {
+            "q_values": q_values,
+            "profit": wholesale_profit_expected(q_values, demand_model, retail_price, wholesale_price, rates),
+            "demand_values": demand_values,
+            "demand_profit": wholesale_profit_deterministic(
+                order_qty, demand_values, retail_price, wholesale_price, rates
+            ),
+        }
 
-    elif contract_type == "Revenue Sharing Contract":
-        q_current = params["Q"]
-        q_max = max(10.0, q_current * 2.0, demand_model.max_reasonable_demand() * 1.5)
-        q_values = np.linspace(0.0, q_max, 70)
-        retailer_curve: list[float] = []
-        supplier_curve: list[float] = []
-        total_curve: list[float] = []
-        for q in q_values:
-            if demand_model.is_random:
-                r, s, t = revenue_sharing_profit_expected(
-                    q,
-                    demand_model,
-                    params["p"],
-                    params["w"],
-                    params["alpha"],
-                    costs,
-                )
-            else:
-                demand = float(demand_model.params["demand"])
-                r, s, t = revenue_sharing_profit_deterministic(
-                    q,
-                    demand,
-                    params["p"],
-                    params["w"],
-                    params["alpha"],
-                    costs,
-                )
-            retailer_curve.append(r)
-            supplier_curve.append(s)
-            total_curve.append(t)
-
-        fig1 = make_figure("Profit vs Order Quantity", "Order Quantity", "Profit")
-        fig1.add_trace(
-            go.Scatter(x=q_values, y=retailer_curve, mode="lines", name="Retailer", line={"color": PALETTE["primary"]})
-        )
-        fig1.add_trace(
-            go.Scatter(x=q_values, y=supplier_curve, mode="lines", name="Supplier", line={"color": PALETTE["secondary"]})
+    if contract_type == "Buyback Contract":
+        order_qty = params["Q"]
+        retail_price = params["p"]
+        wholesale_price = params["w"]
+        buyback_price = params["b"]
+        production_cost = params["c"]
+        q_values = order_quantity_grid(demand_model, order_qty)
+        retailer_curve, manufacturer_curve, total_curve = buyback_profit_expected(
+            q_values,
+            demand_model,
+            retail_price,
+            wholesale_price,
+            buyback_price,
+            production_cost,
+            rates,
         )
-        fig1.add_trace(
-            go.Scatter(x=q_values, y=total_curve, mode="lines", name="Total", line={"color": PALETTE["accent"]})
+        retailer_demand, _, total_demand = buyback_profit_deterministic(
+            order_qty,
+            demand_values,
+            retail_price,
+            wholesale_price,
+            buyback_price,
+            production_cost,
+            rates,
         )
+        return {
+            "q_values": q_values,
+            "retailer": retailer_curve,
+            "manufacturer": manufacturer_curve,
+            "total": total_curve,
+            "demand_values": demand_values,
+            "retailer_demand": retailer_demand,
+            "total_demand": total_demand,
+        }
 
-        demand_values = demand_model.demand_grid(90)
-        retailer_demand: list[float] = []
-        supplier_demand: list[float] = []
-        for d in demand_values:
-            r, s, _ = revenue_sharing_profit_deterministic(
-                params["Q"],
-                float(d),
-                params["p"],
-                params["w"],
-                params["alpha"],
-                costs,
-            )
-            retailer_demand.append(r)
-            supplier_demand.append(s)
-        fig2 = make_figure("Profit vs Demand", "Demand", "Profit")
-        fig2.add_trace(
-            go.Scatter(
-                x=demand_values,
-                y=retailer_demand,
-                mode="lines",
-                name="Retailer",
-                line={"color": PALETTE["primary"]},
-            )
+    if contract_type == "Revenue Sharing Contract":
+        order_qty = params["Q"]
+        retail_price = params["p"]
+        wholesale_price = params["w"]
+        alpha = params["alpha"]
+        q_values = order_quantity_grid(demand_model, order_qty)
+        retailer_curve, supplier_curve, total_curve = revenue_sharing_profit_expected(
+            q_values,
+            demand_model,
+            retail_price,
+            wholesale_price,
+            alpha,
+            rates,
         )
-        fig2.add_trace(
-            go.Scatter(
-                x=demand_values,
-                y=supplier_demand,
-                mode="lines",
-                name="Supplier",
-                line={"color": PALETTE["secondary"]},
-            )
+        retailer_demand, supplier_demand, _ = revenue_sharing_profit_deterministic(
+            order_qty,
+            demand_values,
+            retail_price,
+            wholesale_price,
+            alpha,
+            rates,
         )
-        figures.extend([fig1, fig2])
+        return {
+            "q_values": q_values,
+            "retailer": retailer_curve,
+            "supplier": supplier_curve,
+            "total": total_curve,
+            "demand_values": demand_values,
+            "retailer_demand": retailer_demand,
+            "supplier_demand": supplier_demand,
+        }
 
-    elif contract_type == "Option Contract":
+    if contract_type == "Option Contract":
         option_qty = params["option_qty"]
         strike = params["strike"]
         premium = params["premium"]
@@ -907,130 +1009,324 @@ def graph_functions(
             base_metrics = demand_model.metrics(option_qty)
             expected_min = base_metrics["expected_sales"]
             expected_demand = base_metrics["expected_demand"]
-            option_curve = []
-            spot_curve = []
-            for s in spot_values:
-                if s > strike:
-                    total_cost = option_qty * premium + expected_min * strike + (expected_demand - expected_min) * s
-                else:
-                    total_cost = option_qty * premium + expected_demand * s
-                option_curve.append(total_cost)
-                spot_curve.append(expected_demand * s)
+            reservation = option_qty * premium
+            exercised_cost = reservation + expected_min * strike + (expected_demand - expected_min) * spot_values
+            spot_curve = expected_demand * spot_values
+            option_curve = np.where(spot_values > strike, exercised_cost, reservation + spot_curve)
         else:
             demand = float(demand_model.params["demand"])
-            option_curve = []
-            spot_curve = []
-            for s in spot_values:
-                eval_cost = option_cost_deterministic(demand, option_qty, strike, premium, float(s))
-                option_curve.append(eval_cost["total_cost"])
-                spot_curve.append(eval_cost["spot_only_cost"])
-
-        fig1 = make_figure("Cost vs Spot Price", "Spot Price", "Total Cost")
-        fig1.add_trace(
-            go.Scatter(
-                x=spot_values,
-                y=option_curve,
-                mode="lines",
-                name="Option Strategy",
-                line={"color": PALETTE["primary"]},
-            )
+            option_curve, spot_curve = option_cost_deterministic_vec(demand, option_qty, strike, premium, spot_values)
+
+        cost_curve, spot_only_curve = option_cost_deterministic_vec(demand_values, option_qty, strike, premium, spot)
+        return {
+            "strike": strike,
+            "spot_values": spot_values,
+            "option_curve": option_curve,
+            "spot_curve": spot_curve,
+            "demand_values": demand_values,
+            "cost_curve": cost_curve,
+            "spot_only_curve": spot_only_curve,
+        }
+
+    if contract_type == "Quantity Flexibility Contract":
+        q0 = params["initial_commitment"]
+        adjustment_pct = params["adjustment_pct"]
+        wholesale_price = params["w"]
+        outcome = quantity_flex_deterministic_vec(demand_values, q0, adjustment_pct, wholesale_price, rates)
+        return {
+            "demand_values": demand_values,
+            "cost_curve": outcome["total_cost"],
+            "final_curve": outcome["final_order"],
+            "lower_curve": np.full_like(demand_values, outcome["lower"]),
+            "upper_curve": np.full_like(demand_values, outcome["upper"]),
+        }
+
+    return {}
+
+
+def build_figures(contract_type: str, curves: dict[str, np.ndarray | float]) -> list[go.Figure]:
+    figures: list[go.Figure] = []
+
+    if contract_type == "Wholesale Price Contract":
+        fig1 = make_figure(
+            "Profit vs Order Quantity",
+            "Order Quantity",
+            "Profit",
+            [
+                go.Scattergl(
+                    x=curves["q_values"],
+                    y=curves["profit"],
+                    mode="lines",
+                    name="Profit",
+                    line={"color": PALETTE["primary"], "width": 3},
+                ),
+            ],
         )
-        fig1.add_trace(
-            go.Scatter(
-                x=spot_values,
-                y=spot_curve,
-                mode="lines",
-                name="Pure Spot Strategy",
-                line={"color": PALETTE["secondary"]},
-            )
+
+        fig2 = make_figure(
+            "Profit vs Demand",
+            "Demand",
+            "Profit",
+            [
+                go.Scattergl(
+                    x=curves["demand_values"],
+                    y=curves["demand_profit"],
+                    mode="lines",
+                    name="Profit",
+                    line={"color": PALETTE["secondary"], "width": 3},
+                ),
+            ],
         )
-        fig1.add_vline(x=strike, line_width=1.4, line_dash="dash", line_color=PALETTE["muted"])
-
-        demand_values = demand_model.demand_grid(90)
-        cost_curve = []
-        spot_only_curve = []
-        for d in demand_values:
-            eval_cost = option_cost_deterministic(float(d), option_qty, strike, premium, spot)
-            cost_curve.append(eval_cost["total_cost"])
-            spot_only_curve.append(eval_cost["spot_only_cost"])
-        fig2 = make_figure("Cost vs Demand", "Demand", "Total Cost")
-        fig2.add_trace(
-            go.Scatter(x=demand_values, y=cost_curve, mode="lines", name="Option Strategy", line={"color": PALETTE["primary"]})
+        figures.extend([fig1, fig2])
+
+    elif contract_type == "Buyback Contract":
+        q_values = curves["q_values"]
+        demand_values = curves["demand_values"]
+        fig1 = make_figure(
+            "Profit vs Order Quantity",
+            "Order Quantity",
+            "Profit",
+            [
+                go.Scattergl(
+                    x=q_values,
+                    y=curves["retailer"],
+                    mode="lines",
+                    name="Retailer",
+                    line={"color": PALETTE["primary"]},
+                ),
+                go.Scattergl(
+                    x=q_values,
+                    y=curves["manufacturer"],
+                    mode="lines",
+                    name="Manufacturer",
+                    line={"color": PALETTE["secondary"]},
+                ),
+                go.Scattergl(
+                    x=q_values,
+                    y=curves["total"],
+                    mode="lines",
+                    name="Total",
+                    line={"color": PALETTE["accent"]},
+                ),
+            ],
         )
-        fig2.add_trace(
-            go.Scatter(
-                x=demand_values,
-                y=spot_only_curve,
-                mode="lines",
-                name="Pure Spot Strategy",
-                line={"color": PALETTE["secondary"]},
-            )
+
+        fig2 = make_figure(
+            "Profit vs Demand",
+            "Demand",
+            "Profit",
+            [
+                go.Scattergl(
+                    x=demand_values,
+                    y=curves["retailer_demand"],
+                    mode="lines",
+                    name="Retailer",
+                    line={"color": PALETTE["primary"]},
+                ),
+                go.Scattergl(
+                    x=demand_values,
+                    y=curves["total_demand"],
+                    mode="lines",
+                    name="Total",
+                    line={"color": PALETTE["accent"]},
+                ),
+            ],
         )
         figures.extend([fig1, fig2])
 
-    elif contract_type == "Quantity Flexibility Contract":
-        q0 = params["initial_commitment"]
-        adjustment_pct = params["adjustment_pct"]
-        wholesale_price = params["w"]
-        demand_values = demand_model.demand_grid(100)
-
-        cost_curve = []
-        final_curve = []
-        lower_curve = []
-        upper_curve = []
-        for d in demand_values:
-            outcome = quantity_flex_deterministic(float(d), q0, adjustment_pct, wholesale_price, costs)
-            cost_curve.append(outcome["total_cost"])
-            final_curve.append(outcome["final_order"])
-            lower_curve.append(outcome["lower"])
-            upper_curve.append(outcome["upper"])
-
-        fig1 = make_figure("Total Cost vs Demand", "Demand", "Total Cost")
-        fig1.add_trace(
-            go.Scatter(x=demand_values, y=cost_curve, mode="lines", name="Total Cost", line={"color": PALETTE["primary"]})
+    elif contract_type == "Revenue Sharing Contract":
+        q_values = curves["q_values"]
+        demand_values = curves["demand_values"]
+        fig1 = make_figure(
+            "Profit vs Order Quantity",
+            "Order Quantity",
+            "Profit",
+            [
+                go.Scattergl(
+                    x=q_values,
+                    y=curves["retailer"],
+                    mode="lines",
+                    name="Retailer",
+                    line={"color": PALETTE["primary"]},
+                ),
+                go.Scattergl(
+                    x=q_values,
+                    y=curves["supplier"],
+                    mode="lines",
+                    name="Supplier",
+                    line={"color": PALETTE["secondary"]},
+                ),
+                go.Scattergl(
+                    x=q_values,
+                    y=curves["total"],
+                    mode="lines",
+                    name="Total",
+                    line={"color": PALETTE["accent"]},
+                ),
+            ],
         )
 
-        fig2 = make_figure("Final Order vs Demand", "Demand", "Final Order")
-        fig2.add_trace(
-            go.Scatter(
-                x=demand_values,
-                y=final_curve,
-                mode="lines",
-                name="Final Order",
-                line={"color": PALETTE["secondary"], "width": 3},
-            )
+        fig2 = make_figure(
+            "Profit vs Demand",
+            "Demand",
+            "Profit",
+            [
+                go.Scattergl(
+                    x=demand_values,
+                    y=curves["retailer_demand"],
+                    mode="lines",
+                    name="Retailer",
+                    line={"color": PALETTE["primary"]},
+                ),
+                go.Scattergl(
+                    x=demand_values,
+                    y=curves["supplier_demand"],
+                    mode="lines",
+                    name="Supplier",
+                    line={"color": PALETTE["secondary"]},
+                ),
+            ],
         )
-        fig2.add_trace(
-            go.Scatter(
-                x=demand_values,
-                y=lower_curve,
-                mode="lines",
-                name="Lower Bound",
-                line={"color": PALETTE["muted"], "dash": "dot"},
-            )
+        figures.extend([fig1, fig2])
+
+    elif contract_type == "Option Contract":
+        spot_values = curves["spot_values"]
+        demand_values = curves["demand_values"]
+        fig1 = make_figure(
+            "Cost vs Spot Price",
+            "Spot Price",
+            "Total Cost",
+            [
+                go.Scattergl(
+                    x=spot_values,
+                    y=curves["option_curve"],
+                    mode="lines",
+                    name="Option Strategy",
+                    line={"color": PALETTE["primary"]},
+                ),
+                go.Scattergl(
+                    x=spot_values,
+                    y=curves["spot_curve"],
+                    mode="lines",
+                    name="Pure Spot Strategy",
+                    line={"color": PALETTE["secondary"]},
+                ),
+            ],
         )
-        fig2.add_trace(
-            go.Scatter(
-                x=demand_values,
-                y=upper_curve,
-                mode="lines",
-                name="Upper Bound",
-                line={"color": PALETTE["accent"], "dash": "dot"},
-            )
+        fig1.add_vline(x=curves["strike"], line_width=1.4, line_dash="dash", line_color=PALETTE["muted"])
+
+        fig2 = make_figure(
+            "Cost vs Demand",
+            "Demand",
+            "Total Cost",
+            [
+                go.Scattergl(
+                    x=demand_values,
+                    y=curves["cost_curve"],
+                    mode="lines",
+                    name="Option Strategy",
+                    line={"color": PALETTE["primary"]},
+                ),
+                go.Scattergl(
+                    x=demand_values,
+                    y=curves["spot_only_curve"],
+                    mode="lines",
+                    name="Pure Spot Strategy",
+                    line={"color": PALETTE["secondary"]},
+                ),
+            ],
         )
         figures.extend([fig1, fig2])
 
-    return figures
+    elif contract_type == "Quantity Flexibility Contract":
+        demand_values = curves["demand_values"]
+        fig1 = make_figure(
+            "Total Cost vs Demand",
+            "Demand",
+            "Total Cost",
+            [
+                go.Scattergl(
+                    x=demand_values,
+                    y=curves["cost_curve"],
+                    mode="lines",
+                    name="Total Cost",
+                    line={"color": PALETTE["primary"]},
+                ),
+            ],
+        )
+
+        fig2 = make_figure(
+            "Final Order vs Demand",
+            "Demand",
+            "Final Order",
+            [
+                go.Scattergl(
+                    x=demand_values,
+                    y=curves["final_curve"],
+                    mode="lines",
+                    name="Final Order",
+                    line={"color": PALETTE["secondary"], "width": 3},
+                ),
+                go.Scattergl(
+                    x=demand_values,
+                    y=curves["lower_curve"],
+                    mode="lines",
+                    name="Lower Bound",
+                    line={"color": PALETTE["muted"], "dash": "dot"},
+                ),
+                go.Scattergl(
+                    x=demand_values,
+                    y=curves["upper_curve"],
+                    mode="lines",
+                    name="Upper Bound",
+                    line={"color": PALETTE["accent"], "dash": "dot"},
+                ),
+            ],
+        )
+        figures.extend([fig1, fig2])
+
+    return [compact_figure(fig) for fig in figures]
+
+
+def graph_functions(
+    contract_type: str,
+    demand_model: DemandModel,
+    params: dict[str, float],
+    costs: dict[str, float],
+) -> list[go.Figure]:
+    curves = compute_curves(contract_type, demand_model.cache_key, params, costs)
+    return build_figures(contract_type, curves)
+
+
+def html_text(value: str) -> str:
+    return html.escape(str(value)).replace("$", "&#36;")
+
+
+def last_result(key_prefix: str, inputs_key: tuple) -> dict | None:
+    if st.session_state.get(f"{key_prefix}_last_inputs") == inputs_key:
+        return st.session_state.get(f"{key_prefix}_last_result")
+    return None
+
+
+def remember_result(key_prefix: str, inputs_key: tuple, result: dict) -> dict:
+    st.session_state[f"{key_prefix}_last_inputs"] = inputs_key
+    st.session_state[f"{key_prefix}_last_result"] = result
+    return result
 
 
 def render_metric_grid(metrics: dict[str, str], columns: int = 4) -> None:
     if not metrics:
         return
-    items = list(metrics.items())
-    col_count = min(columns, len(items))
-    cols = st.columns(col_count)
-    for idx, (label, value) in enumerate(items):
-        cols[idx % col_count].metric(label, value)
+    col_count = min(columns, len(metrics))
+    cards = "".join(
+        f"<div class='metric-card'><div class='metric-label'>{html_text(label)}</div>"
+        f"<div class='metric-value'>{html_text(value)}</div></div>"
+        for label, value in metrics.items()
+    )
+    st.markdown(
+        f"<div class='metric-grid' style='grid-template-columns: repeat({col_count}, minmax(0, 1fr))'>{cards}</div>",
+        unsafe_allow_html=True,
+    )
 
 
 def render_results(result: dict, is_random: bool) -> None:
@@ -1087,24 +1383,30 @@ def contract_wholesale(
     if retail_price <= 0.0:
         st.error("Retail price must be greater than zero.")
         return None
-    if costs.get("salvage", 0.0) > retail_price:
+    rates = cost_rates(costs)
+    if rates.salvage > retail_price:
         st.error("Salvage value cannot exceed retail price.")
         return None
 
+    denominator = retail_price - rates.salvage
+    if demand_model.is_random and denominator <= EPS:
+        st.warning("Optimal quantity is not well-defined with the current salvage and price settings.")
+
+    inputs_key = (retail_price, wholesale_price, order_qty, rates, demand_model.cache_key)
+    previous = last_result("wh", inputs_key)
+    if previous is not None:
+        return previous
+
     metrics = demand_model.metrics(order_qty)
-    adjust = inventory_adjustment(metrics["expected_leftover"], metrics["expected_unmet"], costs)
-    profit = retail_price * metrics["expected_sales"] - wholesale_price * order_qty + adjust["net"]
+    adjust = inventory_adjustment(metrics["expected_leftover"], metrics["expected_unmet"], rates)
+    profit = retail_price * metrics["expected_sales"] - wholesale_price * order_qty + adjust.net
 
     optimal_q_display = "N/A"
     fractile_display = "N/A"
-    if demand_model.is_random:
-        denominator = retail_price - costs.get("salvage", 0.0)
-        if denominator > EPS:
-            critical_fractile = float(np.clip((retail_price - wholesale_price) / denominator, 0.0, 1.0))
-            optimal_q_display = fmt_number(demand_model.ppf(critical_fractile))
-            fractile_display = fmt_percent(critical_fractile)
-        else:
-            st.warning("Optimal quantity is not well-defined with the current salvage and price settings.")
+    if demand_model.is_random and denominator > EPS:
+        critical_fractile = clamp((retail_price - wholesale_price) / denominator, 0.0, 1.0)
+        optimal_q_display = fmt_number(demand_model.ppf(critical_fractile))
+        fractile_display = fmt_percent(critical_fractile)
 
     decision = {
         "Chosen Order Quantity": fmt_number(order_qty),
@@ -1137,18 +1439,22 @@ def contract_wholesale(
 
     advanced = {
         "Expected Unmet Demand": fmt_number(metrics["expected_unmet"]),
-        "Salvage Contribution": fmt_currency(adjust["salvage"]),
-        "Holding Cost Impact": fmt_currency(-adjust["holding"]),
-        "Shortage & Penalty Impact": fmt_currency(-(adjust["shortage"] + adjust["penalty"])),
+        "Salvage Contribution": fmt_currency(adjust.salvage),
+        "Holding Cost Impact": fmt_currency(-adjust.holding),
+        "Shortage & Penalty Impact": fmt_currency(-(adjust.shortage + adjust.penalty)),
     }
 
-    return {
-        "decision": decision,
-        "financial": financial,
-        "risk": risk,
-        "figures": figures,
-        "advanced": advanced,
-    }
+    return remember_result(
+        "wh",
+        inputs_key,
+        {
+            "decision": decision,
+            "financial": financial,
+            "risk": risk,
+            "figures": figures,
+            "advanced": advanced,
+        },
+    )
 
 
 def contract_buyback(
@@ -1191,23 +1497,37 @@ def contract_buyback(
     if buyback_price > wholesale_price:
         st.warning("Buyback price exceeds wholesale price. This may create aggressive return incentives.")
 
+    rates = cost_rates(costs)
+    inputs_key = (
+        retail_price,
+        wholesale_price,
+        buyback_price,
+        order_qty,
+        production_cost,
+        rates,
+        demand_model.cache_key,
+    )
+    previous = last_result("bb", inputs_key)
+    if previous is not None:
+        return previous
+
     metrics = demand_model.metrics(order_qty)
-    adjust = inventory_adjustment(metrics["expected_leftover"], metrics["expected_unmet"], costs)
+    adjust = inventory_adjustment(metrics["expected_leftover"], metrics["expected_unmet"], rates)
     retailer_profit = (
         retail_price * metrics["expected_sales"]
         + buyback_price * metrics["expected_leftover"]
         - wholesale_price * order_qty
-        + adjust["net"]
+        + adjust.net
     )
     manufacturer_profit = wholesale_price * order_qty - buyback_price * metrics["expected_leftover"]
-    total_profit = retail_price * metrics["expected_sales"] - production_cost * order_qty + adjust["net"]
+    total_profit = retail_price * metrics["expected_sales"] - production_cost * order_qty + adjust.net
 
     denominator_retailer = retail_price - buyback_price
-    denominator_system = retail_price - costs.get("salvage", 0.0)
+    denominator_system = retail_price - rates.salvage
     coordination = "Indeterminate"
     if denominator_retailer > EPS and denominator_system > EPS:
-        retailer_cf = np.clip((retail_price - wholesale_price) / denominator_retailer, 0.0, 1.0)
-        system_cf = np.clip((retail_price - production_cost) / denominator_system, 0.0, 1.0)
+        retailer_cf = clamp((retail_price - wholesale_price) / denominator_retailer, 0.0, 1.0)
+        system_cf = clamp((retail_price - production_cost) / denominator_system, 0.0, 1.0)
         gap = abs(retailer_cf - system_cf)
         if gap <= 0.03:
             coordination = "Coordinated"
@@ -1251,18 +1571,22 @@ def contract_buyback(
     )
 
     advanced = {
-        "Salvage Contribution": fmt_currency(adjust["salvage"]),
-        "Holding Cost Impact": fmt_currency(-adjust["holding"]),
-        "Shortage & Penalty Impact": fmt_currency(-(adjust["shortage"] + adjust["penalty"])),
+        "Salvage Contribution": fmt_currency(adjust.salvage),
+        "Holding Cost Impact": fmt_currency(-adjust.holding),
+        "Shortage & Penalty Impact": fmt_currency(-(adjust.shortage + adjust.penalty)),
     }
 
-    return {
-        "decision": decision,
-        "financial": financial,
-        "risk": risk,
-        "figures": figures,
-        "advanced": advanced,
-    }
+    return remember_result(
+        "bb",
+        inputs_key,
+        {
+            "decision": decision,
+            "financial": financial,
+            "risk": risk,
+            "figures": figures,
+            "advanced": advanced,
+        },
+    )
 
 
 def contract_revenue_sharing(
@@ -1302,9 +1626,15 @@ def contract_revenue_sharing(
         st.error("Revenue share ratio must be between 0 and 1.")
         return None
 
+    rates = cost_rates(costs)
+    inputs_key = (retail_price, wholesale_price, alpha, order_qty, rates, demand_model.cache_key)
+    previous = last_result("rs", inputs_key)
+    if previous is not None:
+        return previous
+
     metrics = demand_model.metrics(order_qty)
-    adjust = inventory_adjustment(metrics["expected_leftover"], metrics["expected_unmet"], costs)
-    retailer_profit = (1.0 - alpha) * retail_price * metrics["expected_sales"] - wholesale_price * order_qty + adjust["net"]
+    adjust = inventory_adjustment(metrics["expected_leftover"], metrics["expected_unmet"], rates)
+    retailer_profit = (1.0 - alpha) * retail_price * metrics["expected_sales"] - wholesale_price * order_qty + adjust.net
     supplier_profit = alpha * retail_price * metrics["expected_sales"] + wholesale_price * order_qty
     total_profit = retailer_profit + supplier_profit
 
@@ -1336,18 +1666,22 @@ def contract_revenue_sharing(
     )
 
     advanced = {
-        "Salvage Contribution": fmt_currency(adjust["salvage"]),
-        "Holding Cost Impact": fmt_currency(-adjust["holding"]),
-        "Shortage & Penalty Impact": fmt_currency(-(adjust["shortage"] + adjust["penalty"])),
+        "Salvage Contribution": fmt_currency(adjust.salvage),
+        "Holding Cost Impact": fmt_currency(-adjust.holding),
+        "Shortage & Penalty Impact": fmt_currency(-(adjust.shortage + adjust.penalty)),
     }
 
-    return {
-        "decision": decision,
-        "financial": financial,
-        "risk": risk,
-        "figures": figures,
-        "advanced": advanced,
-    }
+    return remember_result(
+        "rs",
+        inputs_key,
+        {
+            "decision": decision,
+            "financial": financial,
+            "risk": risk,
+            "figures": figures,
+            "advanced": advanced,
+        },
+    )
 
 
 def contract_option(
@@ -1374,30 +1708,34 @@ def contract_option(
         st.error("Please correct demand inputs before calculation.")
         return None
 
+    inputs_key = (option_qty, strike, premium, spot, demand_model.cache_key)
+    previous = last_result("op", inputs_key)
+    if previous is not None:
+        return previous
+
     if demand_model.is_random:
         outcome = option_cost_expected(demand_model, option_qty, strike, premium, spot)
-        expected_demand = outcome["expected_demand"]
         risk = {
-            "Expected Demand": fmt_number(expected_demand),
-            "Prob(Demand > Option Qty)": fmt_percent(1.0 - demand_model.cdf(option_qty)),
-            "Expected Unhedged Volume": fmt_number(outcome["expected_unhedged"]),
+            "Expected Demand": fmt_number(outcome.expected_demand),
+            "Prob(Demand > Option Qty)": fmt_percent(outcome.exceed_probability),
+            "Expected Unhedged Volume": fmt_number(outcome.expected_unhedged),
         }
     else:
         deterministic_demand = float(demand_model.params["demand"])
         outcome = option_cost_deterministic(deterministic_demand, option_qty, strike, premium, spot)
         risk = {}
 
-    should_exercise = "YES" if outcome["should_exercise"] > 0.5 else "NO"
-    savings = outcome["spot_only_cost"] - outcome["total_cost"]
+    should_exercise = "YES" if outcome.should_exercise else "NO"
+    savings = outcome.spot_only_cost - outcome.total_cost
 
     decision = {
         "Should Exercise?": should_exercise,
-        "Quantity Exercised": fmt_number(outcome["exercised_qty"]),
+        "Quantity Exercised": fmt_number(outcome.exercised_qty),
         "Break-even Spot Price": fmt_currency(strike + premium),
     }
     financial = {
-        "Total Cost": fmt_currency(outcome["total_cost"]),
-        "Pure Spot Strategy Cost": fmt_currency(outcome["spot_only_cost"]),
+        "Total Cost": fmt_currency(outcome.total_cost),
+        "Pure Spot Strategy Cost": fmt_currency(outcome.spot_only_cost),
         "Cost Advantage vs Spot": fmt_currency(savings),
     }
 
@@ -1419,16 +1757,20 @@ def contract_option(
         "Current Spot Relative to Trigger": "Above Trigger" if spot > strike else "At/Below Trigger",
     }
 
-    return {
-        "decision": decision,
-        "financial": financial,
-        "risk": risk,
-        "figures": figures,
-        "advanced": advanced,
-        "summary_notes": [
-            "Inventory holding, salvage, shortage, and penalty toggles are not applied to option costs in this model."
-        ],
-    }
+    return remember_result(
+        "op",
+        inputs_key,
+        {
+            "decision": decision,
+            "financial": financial,
+            "risk": risk,
+            "figures": figures,
+            "advanced": advanced,
+            "summary_notes": [
+                "Inventory holding, salvage, shortage, and penalty toggles are not applied to option costs in this model."
+            ],
+        },
+    )
 
 
 def contract_quantity_flexibility(
@@ -1467,12 +1809,19 @@ def contract_quantity_flexibility(
         st.error("Please correct demand inputs before calculation.")
         return None
 
+    rates = cost_rates(costs)
+    inputs_key = (initial_commitment, adjustment_pct, wholesale_price, rates, demand_model.cache_key)
+    previous = last_result("qf", inputs_key)
+    if previous is not None:
+        return previous
+
     if demand_model.is_random:
-        outcome = quantity_flex_expected(demand_model, initial_commitment, adjustment_pct, wholesale_price, costs)
+        outcome = quantity_flex_expected(demand_model, initial_commitment, adjustment_pct, wholesale_price, rates)
+        lower_cdf, upper_cdf = demand_model.cdf(np.array([outcome.lower, outcome.upper]))
         risk = {
-            "Expected Demand": fmt_number(outcome["expected_demand"]),
-            "Prob(Demand > Upper Band)": fmt_percent(1.0 - demand_model.cdf(outcome["upper"])),
-            "Prob(Demand < Lower Band)": fmt_percent(demand_model.cdf(outcome["lower"])),
+            "Expected Demand": fmt_number(outcome.expected_demand),
+            "Prob(Demand > Upper Band)": fmt_percent(1.0 - upper_cdf),
+            "Prob(Demand < Lower Band)": fmt_percent(lower_cdf),
         }
         final_label = "Expected Final Order"
     else:
@@ -1482,22 +1831,22 @@ def contract_quantity_flexibility(
             initial_commitment,
             adjustment_pct,
             wholesale_price,
-            costs,
+            rates,
         )
         risk = {}
         final_label = "Final Order Quantity"
 
     decision = {
-        final_label: fmt_number(outcome["final_order"]),
-        "Lower Flex Bound": fmt_number(outcome["lower"]),
-        "Upper Flex Bound": fmt_number(outcome["upper"]),
-        "Service Level": fmt_percent(outcome["service_level"]),
+        final_label: fmt_number(outcome.final_order),
+        "Lower Flex Bound": fmt_number(outcome.lower),
+        "Upper Flex Bound": fmt_number(outcome.upper),
+        "Service Level": fmt_percent(outcome.service_level),
     }
     financial = {
-        "Total Procurement Cost": fmt_currency(outcome["procurement_cost"]),
-        "Total Cost": fmt_currency(outcome["total_cost"]),
-        "Unmet Demand": fmt_number(outcome["unmet"]),
-        "Overstock": fmt_number(outcome["overstock"]),
+        "Total Procurement Cost": fmt_currency(outcome.procurement_cost),
+        "Total Cost": fmt_currency(outcome.total_cost),
+        "Unmet Demand": fmt_number(outcome.unmet),
+        "Overstock": fmt_number(outcome.overstock),
     }
 
     figures = graph_functions(
@@ -1511,21 +1860,24 @@ def contract_quantity_flexibility(
         costs,
     )
 
+    adjust = inventory_adjustment(outcome.overstock, outcome.unmet, rates)
     advanced = {
-        "Holding Cost Impact": fmt_currency(-costs.get("holding", 0.0) * outcome["overstock"]),
-        "Shortage & Penalty Impact": fmt_currency(
-            -(costs.get("shortage", 0.0) + costs.get("penalty", 0.0)) * outcome["unmet"]
-        ),
-        "Salvage Offset": fmt_currency(costs.get("salvage", 0.0) * outcome["overstock"]),
+        "Holding Cost Impact": fmt_currency(-adjust.holding),
+        "Shortage & Penalty Impact": fmt_currency(-(adjust.shortage + adjust.penalty)),
+        "Salvage Offset": fmt_currency(adjust.salvage),
     }
 
-    return {
-        "decision": decision,
-        "financial": financial,
-        "risk": risk,
-        "figures": figures,
-        "advanced": advanced,
-    }
+    return remember_result(
+        "qf",
+        inputs_key,
+        {
+            "decision": decision,
+            "financial": financial,
+            "risk": risk,
+            "figures": figures,
+            "advanced": advanced,
+        },
+    )
 
 
 def build_sidebar() -> tuple[str, str, str | None, dict[str, float]]:
@@ -1577,6 +1929,15 @@ def build_sidebar() -> tuple[str, str, str | None, dict[str, float]]:
     return contract_type, demand_type, distribution_type, costs
 
 
+CONTRACT_HANDLERS: dict[str, Callable[[str, str | None, dict[str, float]], dict | None]] = {
+    "Wholesale Price Contract": contract_wholesale,
+    "Buyback Contract": contract_buyback,
+    "Revenue Sharing Contract": contract_revenue_sharing,
+    "Option Contract": contract_option,
+    "Quantity Flexibility Contract": contract_quantity_flexibility,
+}
+
+
 def main() -> None:
     apply_dark_theme()
     contract_type, demand_type, distribution_type, costs = build_sidebar()
@@ -1587,18 +1948,8 @@ def main() -> None:
         unsafe_allow_html=True,
     )
 
-    result = None
-    if contract_type == "Wholesale Price Contract":
-        result = contract_wholesale(demand_type, distribution_type, costs)
-    elif contract_type == "Buyback Contract":
-        result = contract_buyback(demand_type, distribution_type, costs)
-    elif contract_type == "Revenue Sharing Contract":
-        result = contract_revenue_sharing(demand_type, distribution_type, costs)
-    elif contract_type == "Option Contract":
-        result = contract_option(demand_type, distribution_type, costs)
-    elif contract_type == "Quantity Flexibility Contract":
-        result = contract_quantity_flexibility(demand_type, distribution_type, costs)
-
+    handler = CONTRACT_HANDLERS.get(contract_type)
+    result = handler(demand_type, distribution_type, costs) if handler is not None else None
     if result is not None:
         render_results(result, is_random=(demand_type == "Random"))
 